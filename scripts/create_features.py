@@ -1,18 +1,25 @@
 """
 Combines the earth observation data with the labels to create (x, y) training data
 """
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import multiprocessing
 import os
 import pandas as pd
 import sys
 import tarfile
 
+# Each worker loads tifs into memory, so keep the pool small
+max_workers = 4
+
 # Change the working directory to the directory of this script
 os.chdir(os.path.dirname(os.path.realpath(__file__)))
 
 sys.path.append("..")
 
 from src.utils import data_dir  # noqa: E402
-from src.ETL.dataset import load_all_features_as_df  # noqa: E402
+from src.ETL.dataset import generate_bbox_from_paths, load_all_features_as_df  # noqa: E402
 from src.datasets_labeled import labeled_datasets  # noqa: E402
 
 
@@ -41,12 +48,35 @@ def check_duplicates(features_df: pd.DataFrame) -> str:
         return "\u2714 No duplicates found"
 
 
+def create_features_without_export(dataset_index: int) -> str:
+    """
+    Matches labels to tifs and pickles features for one dataset in a worker process.
+    Datasets are passed by index because their processors can't be pickled.
+    Output is captured and returned so logs from different datasets don't interleave.
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        labeled_datasets[dataset_index].create_features(disable_gee_export=True)
+    return log.getvalue()
+
+
 if __name__ == "__main__":
     report = "DATASET REPORT (autogenerated, do not edit directly)"
-    for d in labeled_datasets:
-        if d.dataset != "one_acre_fund":
-            text = d.create_features()
-            report += "\n\n" + text
+    dataset_indices = [i for i, d in enumerate(labeled_datasets) if d.dataset != "one_acre_fund"]
+
+    # Scan the tifs once before forking so every worker inherits the memoized bboxes
+    generate_bbox_from_paths()
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        for log in executor.map(create_features_without_export, dataset_indices):
+            print(log, end="")
+
+    # Earth Engine exports run serially so a single exporter at a time checks the task quota,
+    # only labels still without features are matched again here
+    for i in dataset_indices:
+        text = labeled_datasets[i].create_features()
+        report += "\n\n" + text
 
     features_df = load_all_features_as_df()
     empty_text = check_empty_features(features_df)
@@ -16,6 +16,7 @@ TIF_PATHS = "tif_paths"
 LABELER_NAMES = "email"
 LABEL_DUR = "analysis_duration"
 CROP_TYPE = "crop_type"
+EXPORT_IDENTIFIER = "export_identifier"
 
 MONTHS = [
     "January",
@@ -1,9 +1,10 @@
 from cropharvest.eo import EarthEngineExporter
+from cropharvest.eo.ee_boundingbox import EEBoundingBox
 from cropharvest.engineer import Engineer
 from datetime import datetime
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 from tqdm import tqdm
 import pandas as pd
 import pickle
@@ -38,17 +39,18 @@ from src.ETL.constants import (
     SUBSET,
     DATASET,
     TIF_PATHS,
+    EXPORT_IDENTIFIER,
 )
 from src.ETL.data_instance import CropDataInstance
 
 unexported_file = data_dir / "unexported.txt"
-unexported = pd.read_csv(unexported_file, sep="\n", header=None)[0].tolist()
+unexported = set(pd.read_csv(unexported_file, sep="\n", header=None)[0])
 
 missing_data_file = data_dir / "missing_data.txt"
-missing_data = pd.read_csv(missing_data_file, sep="\n", header=None)[0].tolist()
+missing_data = set(pd.read_csv(missing_data_file, sep="\n", header=None)[0])
 
 duplicates_data_file = data_dir / "duplicates.txt"
-duplicates_data = pd.read_csv(duplicates_data_file, sep="\n", header=None)[0].tolist()
+duplicates_data = set(pd.read_csv(duplicates_data_file, sep="\n", header=None)[0])
 
 
 @memoize
@@ -59,13 +61,18 @@ def generate_bbox_from_paths() -> Dict[Path, BoundingBox]:
     }
 
 
-def get_tif_paths(path_to_bbox, lat, lon, start_date, end_date, pbar):
-    candidate_paths = []
-    for p, bbox in path_to_bbox.items():
-        if bbox.contains(lat, lon) and f"dates={start_date}_{end_date}" in p.stem:
-            candidate_paths.append(p)
-    pbar.update(1)
-    return candidate_paths
+def get_tif_paths(paths: np.ndarray, bounds: np.ndarray, lat, lon, dates) -> List[Path]:
+    """
+    bounds holds one [min_lat, max_lat, min_lon, max_lon] row per path,
+    so the containment check runs over all tifs at once
+    """
+    in_bbox = (
+        (bounds[:, 0] <= lat)
+        & (lat <= bounds[:, 1])
+        & (bounds[:, 2] <= lon)
+        & (lon <= bounds[:, 3])
+    )
+    return [p for p in paths[in_bbox] if dates in p.stem]
 
 
 def match_labels_to_tifs(labels: pd.DataFrame) -> pd.Series:
@@ -80,22 +87,58 @@ def match_labels_to_tifs(labels: pd.DataFrame) -> pd.Series:
         p: bbox for p, bbox in generate_bbox_from_paths().items() if bbox_for_labels.overlaps(bbox)
     }
 
-    # Match labels to tif files
-    # Faster than going through bboxes
-    with tqdm(total=len(labels), desc="Matching labels to tif paths") as pbar:
-        tif_paths = np.vectorize(get_tif_paths, otypes=[np.ndarray])(
-            path_to_bbox,
-            labels[LAT],
-            labels[LON],
-            labels[START],
-            labels[END],
-            pbar,
+    paths = np.empty(len(path_to_bbox), dtype=object)
+    paths[:] = list(path_to_bbox.keys())
+    bounds = np.array(
+        [[b.min_lat, b.max_lat, b.min_lon, b.max_lon] for b in path_to_bbox.values()]
+    ).reshape(-1, 4)
+
+    # Build the dates part of the tif filename for all labels at once
+    label_dates = "dates=" + labels[START].astype(str) + "_" + labels[END].astype(str)
+
+    # Match each label against all tif bounds at once
+    tif_paths = np.empty(len(labels), dtype=object)
+    for i, (lat, lon, dates) in enumerate(
+        tqdm(
+            zip(labels[LAT], labels[LON], label_dates),
+            total=len(labels),
+            desc="Matching labels to tif paths",
         )
+    ):
+        tif_paths[i] = get_tif_paths(paths, bounds, lat, lon, dates)
     return tif_paths
 
 
+def drop_duplicate_exports(labels: pd.DataFrame, surrounding_metres: int = 80) -> pd.DataFrame:
+    """
+    cropharvest names each exported tif after the label's surrounding bbox (edges rounded
+    to 4 decimals) and dates. Labels with the same export identifier would export the same tif,
+    so only the first of them is kept and the identifier is passed on to the exporter.
+    A dropped label's centre is within ~10m of the kept label's centre, so it lies inside
+    the kept label's 80m tif and is later matched to it.
+    """
+    export_identifiers = pd.Series(
+        [
+            EarthEngineExporter.make_identifier(
+                EEBoundingBox.from_centre(
+                    mid_lat=lat, mid_lon=lon, surrounding_metres=surrounding_metres
+                ),
+                start,
+                end,
+            )
+            for lat, lon, start, end in zip(labels[LAT], labels[LON], labels[START], labels[END])
+        ],
+        index=labels.index,
+    )
+    duplicate_exports = export_identifiers.duplicated()
+    print(f"{duplicate_exports.sum()} labels share an export with another label")
+    labels = labels[~duplicate_exports].copy()
+    labels[EXPORT_IDENTIFIER] = export_identifiers[~duplicate_exports]
+    return labels
+
+
 def find_matching_point(
-    start: str, tif_paths: List[Path], label_lon: float, label_lat: float
+    start: Union[str, datetime], tif_paths: List[Path], label_lon: float, label_lat: float
 ) -> Tuple[np.ndarray, float, float, str]:
     """
     Given a label coordinate (y) this functions finds the associated satellite data (X)
@@ -104,7 +147,7 @@ def find_matching_point(
     So the function finds the closest grid coordinate to the label coordinate.
     Additional value is given to a grid coordinate that is close to the center of the tif.
     """
-    start_date = datetime.strptime(start, "%Y-%m-%d")
+    start_date = start if isinstance(start, datetime) else datetime.strptime(start, "%Y-%m-%d")
     tif_slope_tuples = [
         Engineer.load_tif(p, start_date=start_date, num_timesteps=None) for p in tif_paths
     ]
@@ -144,17 +187,31 @@ def find_matching_point(
 
 
 def create_pickled_labeled_dataset(labels):
-    for label in tqdm(labels.to_dict(orient="records"), desc="Creating pickled instances"):
+    # Parse all start dates at once instead of once per label
+    start_dates = pd.to_datetime(labels[START], format="%Y-%m-%d", cache=True).dt.to_pydatetime()
+    # Iterate over plain column values to avoid building a dict per label
+    for start_date, tif_paths, lon, lat, feature_filename, feature_path in tqdm(
+        zip(
+            start_dates,
+            labels[TIF_PATHS],
+            labels[LON],
+            labels[LAT],
+            labels[FEATURE_FILENAME],
+            labels[FEATURE_PATH],
+        ),
+        total=len(labels),
+        desc="Creating pickled instances",
+    ):
         (labelled_array, tif_lon, tif_lat, tif_file) = find_matching_point(
-            start=label[START],
-            tif_paths=label[TIF_PATHS],
-            label_lon=label[LON],
-            label_lat=label[LAT],
+            start=start_date,
+            tif_paths=tif_paths,
+            label_lon=lon,
+            label_lat=lat,
         )
 
         if labelled_array is None:
             with open(missing_data_file, "a") as f:
-                f.write("\n" + label[FEATURE_FILENAME])
+                f.write("\n" + feature_filename)
             continue
 
         instance = CropDataInstance(
@@ -163,7 +220,7 @@ def create_pickled_labeled_dataset(labels):
             instance_lon=tif_lon,
             source_file=tif_file,
         )
-        save_path = Path(label[FEATURE_PATH])
+        save_path = Path(feature_path)
         save_path.parent.mkdir(exist_ok=True)
         with save_path.open("wb") as f:
             pickle.dump(instance, f)
@@ -212,17 +269,18 @@ class LabeledDataset:
         text += f"(Timesteps: {','.join([str(int(t)) for t in timesteps])})\n"
         text += "----------------------------------------------------------------------------\n"
         train_val_test_counts = df[SUBSET].value_counts()
+        # Split by subset once instead of masking the whole df for every lookup
+        subset_dfs = dict(tuple(df.groupby(SUBSET)))
         for subset, labels_in_subset in train_val_test_counts.items():
-            features_in_subset = df[df[SUBSET] == subset][ALREADY_EXISTS].sum()
+            subset_df = subset_dfs[subset]
+            features_in_subset = subset_df[ALREADY_EXISTS].sum()
             if labels_in_subset != features_in_subset:
                 text += (
                     f"\u2716 {subset}: {labels_in_subset} labels, "
                     + f"but {features_in_subset} features\n"
                 )
             else:
-                crop_percentage = (
-                    df[df[SUBSET] == subset][CROP_PROB] > 0.5
-                ).sum() / labels_in_subset
+                crop_percentage = (subset_df[CROP_PROB] > 0.5).sum() / labels_in_subset
                 text += f"\u2714 {subset} amount: {labels_in_subset}, crop: {crop_percentage:.1%}\n"
 
         return text
@@ -348,13 +406,14 @@ class LabeledDataset:
         if len(labels_with_no_tifs) > 0:
             print(f"{len(labels_with_no_tifs )} labels not matched")
             if not disable_gee_export:
-                labels_with_no_tifs[START] = pd.to_datetime(labels_with_no_tifs[START]).dt.date
-                labels_with_no_tifs[END] = pd.to_datetime(labels_with_no_tifs[END]).dt.date
+                labels_to_export = drop_duplicate_exports(labels_with_no_tifs)
+                labels_to_export[START] = pd.to_datetime(labels_to_export[START]).dt.date
+                labels_to_export[END] = pd.to_datetime(labels_to_export[END]).dt.date
                 EarthEngineExporter(
                     check_ee=True,
                     check_gcp=True,
                     dest_bucket="crop-mask-tifs2",
-                ).export_for_labels(labels=labels_with_no_tifs)
+                ).export_for_labels(labels=labels_to_export)
 
         # -------------------------------------------------
         # STEP 5: Create the features (X, y)
@@ -2,13 +2,12 @@
 https://gis.stackexchange.com/questions/306861/split-geotiff-into-multiple-cells-with-
 """
 
-from shapely import geometry
 from pathlib import Path
 import math
 import logging
 import rasterio
 import re
-from rasterio.mask import mask
+from rasterio.windows import Window
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +15,30 @@ logger = logging.getLogger(__name__)
 # Takes a  dataset and splits it into squares of dimensions squareDim * squareDim
 def splitImageIntoCells(img_path: Path, filename: str, squareDim: int, output_folder: Path):
 
-    img = rasterio.open(img_path)
-    numberOfCellsWide = math.ceil(img.shape[1] / squareDim)
-    numberOfCellsHigh = math.ceil(img.shape[0] / squareDim)
-    count = 0
-    for hc in range(numberOfCellsHigh):
-        y = min(hc * squareDim, img.shape[0])
-        for wc in range(numberOfCellsWide):
-            x = min(wc * squareDim, img.shape[1])
-            geom = getTileGeom(img.transform, x, y, squareDim)
-            getCellFromGeom(img, geom, filename, count, output_folder)
-            count = count + 1
+    with rasterio.open(img_path) as img:
+        numberOfCellsWide = math.ceil(img.shape[1] / squareDim)
+        numberOfCellsHigh = math.ceil(img.shape[0] / squareDim)
+        count = 0
+        for hc in range(numberOfCellsHigh):
+            y = min(hc * squareDim, img.shape[0])
+            for wc in range(numberOfCellsWide):
+                x = min(wc * squareDim, img.shape[1])
+                window = getTileWindow(img, x, y, squareDim)
+                getCellFromWindow(img, window, filename, count, output_folder)
+                count = count + 1
 
 
-# Generate a bounding box from the pixel-wise coordinates
-# using the original datasets transform property
-def getTileGeom(transform, x, y, squareDim):
-    corner1 = (x, y) * transform
-    corner2 = (x + squareDim, y + squareDim) * transform
-    return geometry.box(corner1[0], corner1[1], corner2[0], corner2[1])
+# Generate a pixel window for the cell, clipped to the dataset's extent
+def getTileWindow(img, x, y, squareDim):
+    width = min(squareDim, img.shape[1] - x)
+    height = min(squareDim, img.shape[0] - y)
+    return Window(x, y, width, height)
 
 
-# Crop the dataset using the generated box and write it out as a GeoTIFF
-def getCellFromGeom(img, geom, filename, count, output_folder):
-    crop, cropTransform = mask(img, [geom], crop=True)
+# Read only the cell's pixels from the dataset and write them out as a GeoTIFF
+def getCellFromWindow(img, window, filename, count, output_folder):
+    crop = img.read(window=window)
+    cropTransform = img.window_transform(window)
     writeImageAsGeoTIFF(
         crop, cropTransform, img.meta, img.crs, f"{count}-{filename}", output_folder
     )
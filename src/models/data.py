@@ -54,25 +54,25 @@ class CropDataset(Dataset):
                 + f"({df[LAT].min()}, {df[LON].min()}, {df[LAT].max()}, {df[LON].max()})"
             )
 
-        local_crop = len(df[df["is_local"] & df["is_crop"]])
-        local_non_crop = len(df[df["is_local"] & ~df["is_crop"]])
+        # Count from the boolean masks once rather than filtering df for every count
+        num_local = int(df["is_local"].sum())
+        num_global = len(df) - num_local
+        local_crop = int((df["is_local"] & df["is_crop"]).sum())
+        local_non_crop = num_local - local_crop
         local_difference = np.abs(local_crop - local_non_crop)
 
         self.num_timesteps = self._compute_num_timesteps(start_col=df[START], end_col=df[END])
 
         if wandb_logger:
             to_log: Dict[str, Union[float, int]] = {}
-            if df["is_local"].any():
-                to_log[f"local_{subset}_original_size"] = len(df[df["is_local"]])
-                to_log[f"local_{subset}_crop_percentage"] = round(
-                    local_crop / len(df[df["is_local"]]), 4
-                )
-
-            if not df["is_local"].all():
-                to_log[f"global_{subset}_original_size"] = len(df[~df["is_local"]])
-                to_log[f"global_{subset}_crop_percentage"] = round(
-                    len(df[~df["is_local"] & df["is_crop"]]) / len(df[~df["is_local"]]), 4
-                )
+            if num_local > 0:
+                to_log[f"local_{subset}_original_size"] = num_local
+                to_log[f"local_{subset}_crop_percentage"] = round(local_crop / num_local, 4)
+
+            if num_global > 0:
+                global_crop = int((~df["is_local"] & df["is_crop"]).sum())
+                to_log[f"global_{subset}_original_size"] = num_global
+                to_log[f"global_{subset}_crop_percentage"] = round(global_crop / num_global, 4)
 
             if upsample:
                 to_log[f"{subset}_upsampled_size"] = len(df) + local_difference
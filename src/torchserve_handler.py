@@ -28,7 +28,7 @@ class ModelHandler(BaseHandler):
         uri_as_path = Path(uri)
         bucket_name = uri_as_path.parts[1]
         file_name = "/".join(uri_as_path.parts[2:])
-        bucket = storage.Client().bucket(bucket_name)
+        bucket = self.storage_client.bucket(bucket_name)
         retries = 3
         blob = bucket.blob(file_name)
         for i in range(retries + 1):
@@ -53,6 +53,8 @@ class ModelHandler(BaseHandler):
         model_dir = properties.get("model_dir")
         sys.path.append(model_dir)
         self.inference_module = Inference(model=self.model)
+        # Authenticate once per worker rather than on every request
+        self.storage_client = storage.Client()
 
     def preprocess(self, data) -> str:
         print(data)
@@ -80,7 +82,7 @@ class ModelHandler(BaseHandler):
 
         cloud_dest_parent = "/".join(uri_as_path.parts[2:-1])
         cloud_dest_path_str = f"{cloud_dest_parent}/{local_dest_path.name}"
-        dest_bucket = storage.Client().get_bucket(dest_bucket_name)
+        dest_bucket = self.storage_client.get_bucket(dest_bucket_name)
         dest_blob = dest_bucket.blob(cloud_dest_path_str)
         dest_blob.upload_from_filename(str(local_dest_path))
         dest_uri = f"gs://{dest_bucket_name}/{cloud_dest_path_str}"
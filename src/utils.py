@@ -1,4 +1,6 @@
 from typing import Tuple
+import functools
+import threading
 import torch
 import numpy as np
 import random
@@ -32,11 +34,15 @@ def get_dvc_dir(dvc_dir_name: str) -> Path:
 
 def memoize(f):
     memo = {}
+    lock = threading.RLock()
 
-    def helper(x="default"):
-        if x not in memo:
-            memo[x] = f() if x == "default" else f(x)
-        return memo[x]
+    @functools.wraps(f)
+    def helper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        with lock:
+            if key not in memo:
+                memo[key] = f(*args, **kwargs)
+            return memo[key]
 
     return helper
 
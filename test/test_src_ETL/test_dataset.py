@@ -1,13 +1,29 @@
 from pathlib import Path
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import mock_open, patch
 import numpy as np
 import pandas as pd
 import xarray as xr
 
-from src.ETL.constants import CROP_PROB, FEATURE_PATH, LAT, LON, START, END, TIF_PATHS
+from src.ETL.boundingbox import BoundingBox
+from src.ETL.constants import (
+    CROP_PROB,
+    EXPORT_IDENTIFIER,
+    FEATURE_FILENAME,
+    FEATURE_PATH,
+    LAT,
+    LON,
+    START,
+    END,
+    TIF_PATHS,
+)
 from src.ETL.data_instance import CropDataInstance
-from src.ETL.dataset import find_matching_point, create_pickled_labeled_dataset
+from src.ETL.dataset import (
+    find_matching_point,
+    create_pickled_labeled_dataset,
+    drop_duplicate_exports,
+    match_labels_to_tifs,
+)
 
 
 class TestDataset(TestCase):
@@ -52,6 +68,48 @@ class TestDataset(TestCase):
         expected = np.ones((24, 18)) * 0.0
         self.assertTrue((labelled_np == expected).all())
 
+    @patch("src.ETL.dataset.generate_bbox_from_paths")
+    def test_match_labels_to_tifs(self, mock_generate_bbox_from_paths):
+        tif1 = Path("min_lat=0_min_lon=0_max_lat=2_max_lon=2_dates=2020-01-01_2021-12-31_all.tif")
+        tif2 = Path("min_lat=1_min_lon=1_max_lat=3_max_lon=3_dates=2020-01-01_2021-12-31_all.tif")
+        tif3 = Path("min_lat=0_min_lon=0_max_lat=2_max_lon=2_dates=2019-01-01_2020-12-31_all.tif")
+        mock_generate_bbox_from_paths.return_value = {
+            p: BoundingBox.from_path(p) for p in [tif1, tif2, tif3]
+        }
+        mock_labels = pd.DataFrame(
+            {
+                LON: [0.5, 1.5, 2.5, 5.0],
+                LAT: [0.5, 1.5, 2.5, 5.0],
+                START: ["2020-01-01", "2020-01-01", "2020-01-01", "2020-01-01"],
+                END: ["2021-12-31", "2021-12-31", "2021-12-31", "2021-12-31"],
+            }
+        )
+        tif_paths = match_labels_to_tifs(mock_labels)
+        self.assertEqual(tif_paths.tolist(), [[tif1], [tif1, tif2], [tif2], []])
+
+    def test_drop_duplicate_exports(self):
+        mock_labels = pd.DataFrame(
+            {
+                LAT: [10.0, 10.00001, 10.0, 11.0],
+                LON: [20.0, 20.00001, 20.0, 21.0],
+                START: ["2020-01-01", "2020-01-01", "2019-01-01", "2020-01-01"],
+                END: ["2021-12-31", "2021-12-31", "2020-12-31", "2021-12-31"],
+            }
+        )
+        labels_to_export = drop_duplicate_exports(mock_labels)
+        self.assertEqual(labels_to_export.index.tolist(), [0, 2, 3])
+        self.assertEqual(
+            labels_to_export[EXPORT_IDENTIFIER].tolist(),
+            [
+                "min_lat=9.9993_min_lon=19.9993_max_lat=10.0007_max_lon=20.0007_"
+                + "dates=2020-01-01_2021-12-31_all",
+                "min_lat=9.9993_min_lon=19.9993_max_lat=10.0007_max_lon=20.0007_"
+                + "dates=2019-01-01_2020-12-31_all",
+                "min_lat=10.9993_min_lon=20.9993_max_lat=11.0007_max_lon=21.0007_"
+                + "dates=2020-01-01_2021-12-31_all",
+            ],
+        )
+
     @patch("src.ETL.dataset.Path.open")
     @patch("src.ETL.dataset.find_matching_point")
     @patch("src.ETL.dataset.pickle.dump")
@@ -71,6 +129,7 @@ class TestDataset(TestCase):
                 START: ["2020-01-01", "2020-01-01"],
                 END: ["2021-01-01", "2021-01-01"],
                 TIF_PATHS: [[Path("tif1")], [Path("tif2"), Path("tif3")]],
+                FEATURE_FILENAME: ["feature1", "feature2"],
                 FEATURE_PATH: ["feature1", "feature2"],
             }
         )
@@ -95,3 +154,34 @@ class TestDataset(TestCase):
         self.assertEqual(mock_dump.call_count, 2)
         self.assertEqual(mock_dump.call_args_list[0][0][0], instances[0])
         self.assertEqual(mock_dump.call_args_list[1][0][0], instances[1])
+
+    @patch("src.ETL.dataset.open", new_callable=mock_open, create=True)
+    @patch("src.ETL.dataset.Path.open")
+    @patch("src.ETL.dataset.find_matching_point")
+    @patch("src.ETL.dataset.pickle.dump")
+    def test_create_pickled_labeled_dataset_missing_data(
+        self, mock_dump, mock_find_matching_point, mock_path_open, mock_missing_open
+    ):
+        mock_find_matching_point.side_effect = [
+            (np.array([0.0]), 0.1, 0.1, "mock_file"),
+            (None, 0.1, 0.1, "mock_file"),
+        ]
+
+        mock_labels = pd.DataFrame(
+            {
+                LON: [20, 40],
+                LAT: [30, 50],
+                CROP_PROB: [0.0, 1.0],
+                START: ["2020-01-01", "2020-01-01"],
+                END: ["2021-01-01", "2021-01-01"],
+                TIF_PATHS: [[Path("tif1")], [Path("tif2")]],
+                FEATURE_FILENAME: ["feature1", "feature2"],
+                FEATURE_PATH: ["feature1.pkl", "feature2.pkl"],
+            }
+        )
+
+        create_pickled_labeled_dataset(mock_labels)
+
+        self.assertEqual(mock_dump.call_count, 1)
+        mock_missing_open.assert_called_once()
+        mock_missing_open().write.assert_called_once_with("\nfeature2")
@@ -1,10 +1,13 @@
 from pathlib import Path
 from unittest import TestCase
 from unittest.mock import patch
+import numpy as np
+import rasterio
 import shutil
 import tempfile
 
-from src.ETL.split_tiff import run_split_tiff
+from rasterio.transform import from_origin
+from src.ETL.split_tiff import run_split_tiff, splitImageIntoCells
 
 
 class SplitTiffTest(TestCase):
@@ -44,3 +47,49 @@ class SplitTiffTest(TestCase):
         mock_splitImageIntoCells.assert_called_with(
             self.temp_data_dir / input_file, output_file, 1000, self.temp_data_dir
         )
+
+    def test_splitImageIntoCells(self):
+        data = np.arange(2 * 5 * 7, dtype=np.uint16).reshape(2, 5, 7)
+        transform = from_origin(10.0, 20.0, 0.5, 0.5)
+        img_path = self.temp_data_dir / "image.tif"
+        with rasterio.open(
+            img_path,
+            "w",
+            driver="GTiff",
+            height=5,
+            width=7,
+            count=2,
+            dtype=data.dtype,
+            crs="EPSG:4326",
+            transform=transform,
+        ) as dst:
+            dst.write(data)
+
+        output_folder = self.temp_data_dir / "cells"
+        output_folder.mkdir()
+        splitImageIntoCells(img_path, "image", 3, output_folder)
+
+        self.assertEqual(len(list(output_folder.glob("*.tif"))), 6)
+
+        # (row offset, col offset, height, width) per cell, counted row by row
+        expected_cells = [
+            (0, 0, 3, 3),
+            (0, 3, 3, 3),
+            (0, 6, 3, 1),
+            (3, 0, 2, 3),
+            (3, 3, 2, 3),
+            (3, 6, 2, 1),
+        ]
+        for count, (row, col, height, width) in enumerate(expected_cells):
+            with rasterio.open(output_folder / f"{count}-image.tif") as cell:
+                cell_data = cell.read()
+                self.assertEqual(cell_data.shape, (2, height, width))
+                expected_data = data[:, row : row + height, col : col + width]
+                self.assertTrue((cell_data == expected_data).all())
+                expected_transform = from_origin(10.0 + col * 0.5, 20.0 - row * 0.5, 0.5, 0.5)
+                self.assertEqual(cell.transform, expected_transform)
+
+        with rasterio.open(output_folder / "2-image.tif") as right_edge_cell:
+            self.assertEqual(right_edge_cell.transform, from_origin(13.0, 20.0, 0.5, 0.5))
+        with rasterio.open(output_folder / "5-image.tif") as bottom_right_cell:
+            self.assertEqual(bottom_right_cell.transform, from_origin(13.0, 18.5, 0.5, 0.5))
@@ -3,7 +3,7 @@ from unittest import TestCase
 import numpy as np
 import xarray as xr
 
-from src.utils import find_nearest, distance, distance_point_from_center
+from src.utils import find_nearest, distance, distance_point_from_center, memoize
 
 
 class TestUtils(TestCase):
@@ -27,3 +27,26 @@ class TestUtils(TestCase):
         self.assertEqual(distance_point_from_center(0, 1, tif), 1.0)
         self.assertEqual(distance_point_from_center(1, 1, tif), 0.0)
         self.assertEqual(distance_point_from_center(2, 1, tif), 1.0)
+
+    def test_memoize(self):
+        calls = []
+
+        @memoize
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+
+        self.assertEqual(add(1), 1)
+        self.assertEqual(add(1), 1)
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(calls, [(1, 0), (1, 2)])
+
+        @memoize
+        def no_args():
+            calls.append(())
+            return "value"
+
+        self.assertEqual(no_args(), "value")
+        self.assertEqual(no_args(), "value")
+        self.assertEqual(calls.count(()), 1)